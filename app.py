@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import sys
+import threading
+import time
 import types
 from dataclasses import dataclass
-from typing import Dict
+from functools import lru_cache
+from typing import Callable, Dict, NamedTuple, Tuple
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
+from numba import njit, prange
 import streamlit as st
 
 # ─────────────────────────  DATA CLASSES & CONSTANTS  ───────────────────────── #
@@ -20,6 +24,7 @@ class Fuel:
     lhv_mj_kg: float
     co2_factor_kg_t: float
     price_usd_t: float
+    is_smr: bool = False
 
 
 @dataclass(frozen=True)
@@ -29,25 +34,86 @@ class VesselClass:
     cargo_tonnes: int
 
 
-FUEL_DATA: Dict[str, Fuel] = {
-    "VLSFO": Fuel("VLSFO", 0.97, 40.2, 3_114, 650),
-    "LNG": Fuel("LNG", 0.45, 50.0, 2_750, 450),
-    "Bio‑VLSFO": Fuel("Bio‑VLSFO", 0.93, 39.7, 180, 900),
-    "Methanol": Fuel("Methanol", 0.79, 19.9, 1_375, 550),
-    "SMR (Nuclear)": Fuel("SMR (Nuclear)", 19.1, 80_620, 0, 0),
-}
+class KPI(NamedTuple):
+    fuel_t: float
+    co2_t: float
+    fuel_spend: float
+    carbon_spend: float
+    total_spend: float
+    usd_per_tonne_mile: float
+
 
 A_HANDY, A_SUPRA, A_PAN = (24 / 16**3, 30 / 16**3, 44 / 16**3)
-VESSEL_CLASSES: Dict[str, VesselClass] = {
-    "Handysize (40 kt DWT)": VesselClass("Handysize", A_HANDY, 40_000),
-    "Supramax (55 kt DWT)":  VesselClass("Supramax",  A_SUPRA, 55_000),
-    "Panamax (75 kt DWT)":   VesselClass("Panamax",   A_PAN,    75_000),
-}
+SPEED_MIN_KN, SPEED_MAX_KN, SPEED_STEP_KN = 8.0, 16.0, 0.1
+
+
+# built once per process; reruns get the same objects back by reference
+@st.cache_resource(show_spinner=False)
+def _tables():
+    fuel_data: Dict[str, Fuel] = {
+        "VLSFO": Fuel("VLSFO", 0.97, 40.2, 3_114, 650),
+        "LNG": Fuel("LNG", 0.45, 50.0, 2_750, 450),
+        "Bio‑VLSFO": Fuel("Bio‑VLSFO", 0.93, 39.7, 180, 900),
+        "Methanol": Fuel("Methanol", 0.79, 19.9, 1_375, 550),
+        "SMR (Nuclear)": Fuel("SMR (Nuclear)", 19.1, 80_620, 0, 0, is_smr=True),
+    }
 
-# ───────────────────────────────  CALCULATIONS  ────────────────────────────── #
+    vessel_classes: Dict[str, VesselClass] = {
+        "Handysize (40 kt DWT)": VesselClass("Handysize", A_HANDY, 40_000),
+        "Supramax (55 kt DWT)":  VesselClass("Supramax",  A_SUPRA, 55_000),
+        "Panamax (75 kt DWT)":   VesselClass("Panamax",   A_PAN,    75_000),
+    }
+
+    # widget options and structure‑of‑arrays views, ordered as the dicts above
+    fuel_labels = tuple(fuel_data)
+    vessel_labels = tuple(vessel_classes)
+    fuel_idx: Dict[str, int] = {k: i for i, k in enumerate(fuel_data)}
+    vessel_idx: Dict[str, int] = {k: i for i, k in enumerate(vessel_classes)}
+    fuel_co2 = np.array([f.co2_factor_kg_t for f in fuel_data.values()], dtype=float)
+    fuel_price = np.array([f.price_usd_t for f in fuel_data.values()], dtype=float)
+    fuel_is_smr = np.array([f.is_smr for f in fuel_data.values()])
+    vessel_a = np.array([v.coefficient_a for v in vessel_classes.values()], dtype=float)
+    vessel_cargo = np.array([v.cargo_tonnes for v in vessel_classes.values()], dtype=float)
+
+    # every speed the slider can produce, and its square
+    speed_grid_kn = np.round(
+        np.arange(SPEED_MIN_KN, SPEED_MAX_KN + SPEED_STEP_KN / 2, SPEED_STEP_KN), 1
+    )
+    speed_squares = np.array([v**2 for v in speed_grid_kn.tolist()])
+    return (
+        fuel_data,
+        vessel_classes,
+        fuel_labels,
+        vessel_labels,
+        fuel_idx,
+        vessel_idx,
+        fuel_co2,
+        fuel_price,
+        fuel_is_smr,
+        vessel_a,
+        vessel_cargo,
+        speed_grid_kn,
+        speed_squares,
+    )
 
-calc_mod = types.ModuleType("mccse.calculations")
 
+(
+    FUEL_DATA,
+    VESSEL_CLASSES,
+    FUEL_LABELS,
+    VESSEL_LABELS,
+    FUEL_IDX,
+    VESSEL_IDX,
+    FUEL_CO2,
+    FUEL_PRICE,
+    FUEL_IS_SMR,
+    VESSEL_A,
+    VESSEL_CARGO,
+    SPEED_GRID_KN,
+    SPEED_SQUARES,
+) = _tables()
+
+# ───────────────────────────────  CALCULATIONS  ────────────────────────────── #
 
 def penalty_factor(foul: float, wind: float, solar: float) -> float:
     fouling = 1 + foul / 100.0
@@ -59,6 +125,14 @@ def voyage_days(dist_nm: float, speed_kn: float) -> float:
     return dist_nm / (speed_kn * 24.0)
 
 
+def speed_squared(speed_kn: float) -> float:
+    # table lookup for slider speeds, plain pow for anything off the grid
+    i = round((speed_kn - SPEED_MIN_KN) / SPEED_STEP_KN)
+    if 0 <= i < SPEED_GRID_KN.size and SPEED_GRID_KN[i] == speed_kn:
+        return float(SPEED_SQUARES[i])
+    return speed_kn**2
+
+
 def fuel_tonnes(
     vessel: VesselClass,
     fuel: Fuel,
@@ -68,10 +142,11 @@ def fuel_tonnes(
     wind: float,
     solar: float,
 ) -> float:
-    if fuel.label.startswith("SMR"):
+    if fuel.is_smr:
         return 0.0
-    daily = vessel.coefficient_a * speed_kn**3 * penalty_factor(foul, wind, solar)
-    return daily * voyage_days(dist_nm, speed_kn)
+    # a·v³·pen per day × dist / (24·v) days, with one v cancelled
+    pen = max((1 + foul / 100.0) * (1 - (wind + solar) / 100.0), 0.7)
+    return vessel.coefficient_a * speed_squared(speed_kn) * dist_nm * pen / 24.0
 
 
 def co2_t(fuel_t: float, fuel: Fuel) -> float:
@@ -90,13 +165,146 @@ def usd_per_tonne_mile(total: float, cargo_t: int, dist_nm: float) -> float:
     return total / (cargo_t * dist_nm)
 
 
-# register helpers so import works if users move to package structure
-for _n, _o in list(locals().items()):
-    if callable(_o) and _n not in ("calc_mod", "Fuel", "VesselClass"):
-        setattr(calc_mod, _n, _o)
-sys.modules.setdefault("mccse", types.ModuleType("mccse"))
-sys.modules["mccse"].calculations = calc_mod
-sys.modules["mccse.calculations"] = calc_mod
+def penalty_factor_vec(
+    foul: float | np.ndarray, wind: float | np.ndarray, solar: float | np.ndarray
+) -> np.ndarray:
+    return np.maximum((1 + foul / 100.0) * (1 - (wind + solar) / 100.0), 0.7)
+
+
+def fuel_tonnes_vec(
+    a: np.ndarray, speed_kn: np.ndarray, dist_nm: float, pen: float | np.ndarray
+) -> np.ndarray:
+    # vessel × speed; pen is a scalar or runs along the speed axis
+    return a[:, None] * speed_kn[None, :] ** 2 * dist_nm * pen / 24.0
+
+
+def run_model_grid(
+    speeds: np.ndarray,
+    dist_nm: float,
+    foul: float | np.ndarray,
+    wind: float | np.ndarray,
+    solar: float | np.ndarray,
+    co2_price: float,
+) -> Dict[str, np.ndarray]:
+    # every KPI as a fuel × vessel × speed array; foul / wind / solar may be
+    # scalars or arrays broadcastable along the speed axis
+    speeds = np.asarray(speeds, dtype=float)
+    pen = penalty_factor_vec(np.asarray(foul), np.asarray(wind), np.asarray(solar))
+    burn = fuel_tonnes_vec(VESSEL_A, speeds, dist_nm, pen)
+    fuel_t = np.where(FUEL_IS_SMR[:, None, None], 0.0, burn[None, :, :])
+    co2 = fuel_t * FUEL_CO2[:, None, None] / 1_000.0
+    fuel_sp = fuel_t * FUEL_PRICE[:, None, None]
+    carb_sp = co2 * co2_price
+    total = fuel_sp + carb_sp
+    return {
+        "fuel_t": fuel_t,
+        "co2_t": co2,
+        "fuel_spend": fuel_sp,
+        "carbon_spend": carb_sp,
+        "total_spend": total,
+        "usd_per_tonne_mile": total / (VESSEL_CARGO[None, :, None] * dist_nm),
+    }
+
+
+@njit(cache=True)
+def _kernel(
+    a: float,
+    cargo: float,
+    co2_fac: float,
+    price: float,
+    is_smr: bool,
+    speed: float,
+    dist_nm: float,
+    foul: float,
+    wind: float,
+    solar: float,
+    co2_price: float,
+) -> Tuple[float, float, float, float, float, float]:
+    # the whole scalar chain in one compiled function
+    pen = max((1 + foul / 100.0) * (1 - (wind + solar) / 100.0), 0.7)
+    fuel_t = 0.0 if is_smr else a * speed**2 * dist_nm * pen / 24.0
+    co2 = fuel_t * co2_fac / 1_000.0
+    fuel_sp = fuel_t * price
+    carb_sp = co2 * co2_price
+    total = fuel_sp + carb_sp
+    return fuel_t, co2, fuel_sp, carb_sp, total, total / (cargo * dist_nm)
+
+
+@njit(parallel=True, cache=True)
+def _sweep(
+    a: np.ndarray,
+    cargo: np.ndarray,
+    co2_fac: np.ndarray,
+    price: np.ndarray,
+    is_smr: np.ndarray,
+    speeds: np.ndarray,
+    dist_nm: float,
+    foul: float,
+    wind: float,
+    solar: float,
+    co2_price: float,
+    out: np.ndarray,
+) -> None:
+    # $/t‑mile for every fuel × vessel cell, cells split across cores
+    pen = max((1 + foul / 100.0) * (1 - (wind + solar) / 100.0), 0.7)
+    n_vessels = a.size
+    for cell in prange(co2_fac.size * n_vessels):
+        fi = cell // n_vessels
+        vi = cell % n_vessels
+        for j in range(speeds.size):
+            speed = speeds[j]
+            fuel_t = 0.0 if is_smr[fi] else a[vi] * speed**2 * dist_nm * pen / 24.0
+            co2 = fuel_t * co2_fac[fi] / 1_000.0
+            total = fuel_t * price[fi] + co2 * co2_price
+            out[fi, vi, j] = total / (cargo[vi] * dist_nm)
+
+
+# the default numba threading layer must not be entered from two threads at
+# once, and every Streamlit session runs on its own thread
+@st.cache_resource(show_spinner=False)
+def _sweep_lock() -> threading.Lock:
+    return threading.Lock()
+
+
+def usd_per_tonne_mile_sweep(
+    speeds: np.ndarray,
+    dist_nm: float,
+    foul: float,
+    wind: float,
+    solar: float,
+    co2_price: float,
+) -> np.ndarray:
+    # fuel × vessel × speed, same cells as run_model_grid(...)["usd_per_tonne_mile"]
+    speeds = np.ascontiguousarray(speeds, dtype=float)
+    out = np.empty((FUEL_CO2.size, VESSEL_A.size, speeds.size))
+    with _sweep_lock():
+        _sweep(
+            VESSEL_A,
+            VESSEL_CARGO,
+            FUEL_CO2,
+            FUEL_PRICE,
+            FUEL_IS_SMR,
+            speeds,
+            float(dist_nm),
+            float(foul),
+            float(wind),
+            float(solar),
+            float(co2_price),
+            out,
+        )
+    return out
+
+
+# register helpers so import works if users move to package structure;
+# sys.modules outlives reruns, so this only has to happen once per process
+if "mccse.calculations" not in sys.modules:
+    calc_mod = types.ModuleType("mccse.calculations")
+    for _n, _o in list(locals().items()):
+        if callable(_o) and _n not in ("calc_mod", "Fuel", "VesselClass", "KPI"):
+            setattr(calc_mod, _n, _o)
+    sys.modules.setdefault("mccse", types.ModuleType("mccse"))
+    sys.modules["mccse"].calculations = calc_mod
+    sys.modules["mccse.calculations"] = calc_mod
 
 # ───────────────────────────────  STREAMLIT UI  ────────────────────────────── #
 
@@ -105,10 +313,17 @@ st.set_page_config(
     layout="wide",
 )
 
+
+@st.cache_resource(show_spinner=False)
+def _logo() -> bytes:
+    with open("mccse_logo_wide.png", "rb") as f:
+        return f.read()
+
+
 # centre‑aligned logo per user layout
 left, middle, right = st.columns([1, 2, 1])
 with middle:
-    st.image("mccse_logo_wide.png", width=1000)
+    st.image(_logo(), width=1000)
 
 st.title("Multi‑Fuel Carbon & Cost Scenario Explorer (MCCSE)")
 
@@ -116,12 +331,14 @@ st.title("Multi‑Fuel Carbon & Cost Scenario Explorer (MCCSE)")
 
 with st.sidebar:
     st.header("Vessel")
-    ship_class = st.selectbox("Class", VESSEL_CLASSES.keys(), index=2)
-    speed_kn = st.slider("Speed (kn)", 8.0, 16.0, 13.0, 0.1)
+    ship_class = st.selectbox("Class", VESSEL_LABELS, index=2)
+    speed_kn = st.slider(
+        "Speed (kn)", SPEED_MIN_KN, SPEED_MAX_KN, 13.0, SPEED_STEP_KN
+    )
     st.divider()
 
     st.header("Fuel")
-    fuel_label = st.radio("Type", list(FUEL_DATA.keys()), index=0)
+    fuel_label = st.radio("Type", FUEL_LABELS, index=0)
     st.divider()
 
     st.header("Voyage")
@@ -153,7 +370,40 @@ with st.sidebar:
 
 # ─────────────────────────────  CALCULATION  ───────────────────────────────── #
 
-@st.cache_data(show_spinner=False)
+# reruns re-execute this script, so the lru cache is held as a resource
+@st.cache_resource(show_spinner=False)
+def _model_memo() -> Callable[..., KPI]:
+    @lru_cache(maxsize=4096)
+    def _run_model_cached(
+        vessel_key: str,
+        fuel_key: str,
+        speed: float,
+        dist_nm: float,
+        foul: int,
+        wind: int,
+        solar: int,
+        co2_price: float,
+    ) -> KPI:
+        fi = FUEL_IDX[fuel_key]
+        vi = VESSEL_IDX[vessel_key]
+        kpi = _kernel(
+            VESSEL_A[vi],
+            VESSEL_CARGO[vi],
+            FUEL_CO2[fi],
+            FUEL_PRICE[fi],
+            bool(FUEL_IS_SMR[fi]),
+            float(speed),
+            float(dist_nm),
+            float(foul),
+            float(wind),
+            float(solar),
+            float(co2_price),
+        )
+        return KPI(*kpi)
+
+    return _run_model_cached
+
+
 def run_model(
     vessel_key: str,
     fuel_key: str,
@@ -163,29 +413,38 @@ def run_model(
     wind: int,
     solar: int,
     co2_price: float,
-) -> dict[str, float]:
-    vessel = VESSEL_CLASSES[vessel_key]
-    fuel = FUEL_DATA[fuel_key]
-
-    fuel_t = fuel_tonnes(vessel, fuel, speed, dist_nm, foul, wind, solar)
-    co2 = co2_t(fuel_t, fuel)
-    fuel_sp = fuel_cost(fuel_t, fuel)
-    carb_sp = carbon_cost(co2, co2_price)
-    total = fuel_sp + carb_sp
-    ctm = usd_per_tonne_mile(total, vessel.cargo_tonnes, dist_nm)
-    return {
-        "fuel_t": fuel_t,
-        "co2_t": co2,
-        "fuel_spend": fuel_sp,
-        "carbon_spend": carb_sp,
-        "total_spend": total,
-        "usd_per_tonne_mile": ctm,
-    }
+) -> KPI:
+    # snap inputs onto their widget grids so float noise can't split cache keys
+    return _model_memo()(
+        vessel_key,
+        fuel_key,
+        round(speed, 1),
+        float(dist_nm),
+        round(foul),
+        round(wind),
+        round(solar),
+        float(co2_price),
+    )
+
+
+HISTORY_COLUMNS: Dict[str, str] = {
+    "ts": "int64",
+    "Vessel": "object",
+    "Fuel": "object",
+    "Speed (kn)": "float64",
+    "Dist (nm)": "float64",
+    "Fuel (t)": "float64",
+    "CO₂ (t)": "float64",
+    "$/t‑mile": "float64",
+}
 
+HISTORY_MAXLEN = 200
 
 # session state history init
-if "history" not in st.session_state:
-    st.session_state.history = []
+if "hist_df" not in st.session_state:
+    st.session_state.hist_df = pd.DataFrame(
+        {c: pd.Series(dtype=t) for c, t in HISTORY_COLUMNS.items()}
+    )
 
 # compute on click / first load
 if calculate_clicked or "kpi" not in st.session_state:
@@ -201,44 +460,62 @@ if calculate_clicked or "kpi" not in st.session_state:
     )
     # store snapshot in history
     snapshot = {
-        "Time": datetime.now().strftime("%H:%M:%S"),
+        "ts": int(time.time()),
         "Vessel": ship_class.split()[0],
         "Fuel": fuel_label.split()[0],
         "Speed (kn)": speed_kn,
         "Dist (nm)": distance_nm,
-        "Fuel (t)": round(st.session_state.kpi["fuel_t"], 1),
-        "CO₂ (t)": round(st.session_state.kpi["co2_t"], 1),
-        "$/t‑mile": round(st.session_state.kpi["usd_per_tonne_mile"], 5),
+        "Fuel (t)": round(st.session_state.kpi.fuel_t, 1),
+        "CO₂ (t)": round(st.session_state.kpi.co2_t, 1),
+        "$/t‑mile": round(st.session_state.kpi.usd_per_tonne_mile, 5),
     }
-    st.session_state.history.append(snapshot)
+    hist_df = st.session_state.hist_df
+    hist_df.loc[hist_df.index[-1] + 1 if len(hist_df) else 0] = snapshot
+    if len(hist_df) > HISTORY_MAXLEN:
+        hist_df.drop(hist_df.index[0], inplace=True)
 
 kpi = st.session_state.kpi
 
 # ─────────────────────────────  MAIN OUTPUT  ──────────────────────────────── #
-m1, m2, m3, m4, m5 = st.columns(5)
-m1.metric("Fuel (t)", f"{kpi['fuel_t']:.1f}")
-m2.metric("CO₂ (t)", f"{kpi['co2_t']:.1f}")
-m3.metric("Fuel cost", f"${kpi['fuel_spend']:,.0f}")
-m4.metric("Carbon cost", f"${kpi['carbon_spend']:,.0f}")
-m5.metric("$ / tonne‑mile", f"${kpi['usd_per_tonne_mile']:.5f}")
 
-st.subheader("Cost breakdown")
-st.plotly_chart(
-    px.bar(
-        pd.DataFrame(
-            {"Component": ["Fuel", "Carbon"], "USD": [kpi["fuel_spend"], kpi["carbon_spend"]]}
-        ),
+@st.cache_data(show_spinner=False)
+def _cost_bar(fuel_spend: float, carbon_spend: float):
+    # imported on first call, after the KPI metrics have already been sent
+    import plotly.express as px
+
+    return px.bar(
+        pd.DataFrame({"Component": ["Fuel", "Carbon"], "USD": [fuel_spend, carbon_spend]}),
         x="Component",
         y="USD",
         text_auto=".2s",
-    ),
+    )
+
+
+m1, m2, m3, m4, m5 = st.columns(5)
+m1.metric("Fuel (t)", f"{kpi.fuel_t:.1f}")
+m2.metric("CO₂ (t)", f"{kpi.co2_t:.1f}")
+m3.metric("Fuel cost", f"${kpi.fuel_spend:,.0f}")
+m4.metric("Carbon cost", f"${kpi.carbon_spend:,.0f}")
+m5.metric("$ / tonne‑mile", f"${kpi.usd_per_tonne_mile:.5f}")
+
+st.subheader("Cost breakdown")
+st.plotly_chart(
+    _cost_bar(kpi.fuel_spend, kpi.carbon_spend),
     use_container_width=True,
 )
 
 # ─────────────────────────────  SESSION HISTORY  ─────────────────────────── #
-if st.session_state.history:
+if not st.session_state.hist_df.empty:
     st.subheader("Calculation history")
-    hist_df = pd.DataFrame(st.session_state.history)
+    hist_df = st.session_state.hist_df.drop(columns="ts")
+    # format the stored epoch seconds as local wall‑clock time, whole column at once
+    hist_df.insert(
+        0,
+        "Time",
+        pd.to_datetime(st.session_state.hist_df["ts"], unit="s", utc=True)
+        .dt.tz_convert(datetime.now().astimezone().tzinfo)
+        .dt.strftime("%H:%M:%S"),
+    )
     st.dataframe(hist_df, use_container_width=True)
 
 # ─────────────────────────────  ABOUT SECTION  ───────────────────────────── #